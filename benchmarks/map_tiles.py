@@ -0,0 +1,83 @@
+"""Compare full and tiled map rendering.
+
+Simulates a cleaning run on a large map: every update the robot moves a
+few cells and cleans the cells around it. The full renderer encodes the
+whole map every update, the tiled renderer only the tiles that changed.
+
+Run from the repository root (requires Home Assistant to be installed):
+
+    python -m benchmarks.map_tiles
+"""
+import random
+import time
+
+from custom_components.cleanmate.devices.map_tiles import (
+    CELL_FLOOR,
+    CELL_UNKNOWN,
+    CELL_WALL,
+    TileMap,
+    encode_png,
+    render_cells,
+)
+
+UPDATES = 100
+
+
+def make_grid(size: int) -> bytearray:
+    """A square room with walls around it, mostly unexplored."""
+    grid = bytearray([CELL_UNKNOWN]) * (size * size)
+    for i in range(size):
+        grid[i] = grid[(size - 1) * size + i] = CELL_WALL
+        grid[i * size] = grid[i * size + size - 1] = CELL_WALL
+    return grid
+
+
+def walk(size: int, updates: int) -> list[tuple[int, int]]:
+    """Positions of a robot walking around the map."""
+    rng = random.Random(0)
+    x = y = size // 2
+    positions = []
+    for _ in range(updates):
+        x = min(max(x + rng.randint(-3, 3), 2), size - 3)
+        y = min(max(y + rng.randint(-3, 3), 2), size - 3)
+        positions.append((x, y))
+    return positions
+
+
+def run(size: int) -> None:
+    grid = make_grid(size)
+    positions = walk(size, UPDATES)
+
+    full_time = full_bytes = 0
+    tiled_time = tiled_bytes = 0
+    tile_map = TileMap()
+    tile_map.update(render_cells(bytes(grid), size), size, size)
+    version = tile_map.version
+
+    for x, y in positions:
+        for dy in (-1, 0, 1):
+            grid[(y + dy) * size + x - 1:(y + dy) * size + x + 2] = bytes(
+                [CELL_FLOOR]
+            ) * 3
+        cells = render_cells(bytes(grid), size, (x, y))
+
+        start = time.perf_counter()
+        full_bytes += len(encode_png(cells, size, size))
+        full_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        tile_map.update(cells, size, size)
+        tiled_bytes += sum(len(image) for *_, image in tile_map.tiles_since(version))
+        version = tile_map.version
+        tiled_time += time.perf_counter() - start
+
+    print(
+        f"{size}x{size}: "
+        f"full {full_time / UPDATES * 1000:.2f} ms, {full_bytes // UPDATES} B / update; "
+        f"tiled {tiled_time / UPDATES * 1000:.2f} ms, {tiled_bytes // UPDATES} B / update"
+    )
+
+
+if __name__ == "__main__":
+    for size in (256, 512, 1024):
+        run(size)
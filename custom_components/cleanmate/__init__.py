@@ -1,38 +1,89 @@
 """The Cleanmate integration."""
+import asyncio
 import logging
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.const import CONF_HOST
-from .const import DOMAIN, CONF_AUTH_CODE
-from .devices.vacuum import CleanmateVacuum
+from homeassistant.helpers.storage import Store
+from .const import (
+    DOMAIN,
+    CONF_AUTH_CODE,
+    CONF_MAP_REFRESH_INTERVAL,
+    CONF_ALWAYS_FETCH_MAP,
+    DEFAULT_MAP_REFRESH_INTERVAL,
+    HISTORY_STORAGE_VERSION,
+    HISTORY_SAVE_DELAY,
+)
+from .devices.history import History
+from .devices.jobs import JobScheduler
+from .devices.map_tiles import TileMap
+from .devices.vacuum import CleanmateVacuum, PollPolicy
+from .websocket import async_register_websocket_commands
 
 # List of platforms to support. There should be a matching .py file for each,
 # eg <cover.py> and <sensor.py>
-PLATFORMS: list[str] = ["vacuum", "number"]
+PLATFORMS: list[str] = ["vacuum", "number", "sensor"]
+
+_LOGGER = logging.getLogger(__name__)
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Cleanmate from a config entry."""
     hass.data.setdefault(DOMAIN, {})
+    async_register_websocket_commands(hass)
     hass.data[DOMAIN][entry.entry_id] = dict(entry.data)
 
     config = dict(entry.data)
     host = config[CONF_HOST]
     auth_code = config[CONF_AUTH_CODE]
 
-    device = CleanmateVacuum(host, auth_code)
+    poll_policy = PollPolicy(
+        map_refresh_interval=entry.options.get(
+            CONF_MAP_REFRESH_INTERVAL, DEFAULT_MAP_REFRESH_INTERVAL
+        ),
+        always_fetch_map=entry.options.get(CONF_ALWAYS_FETCH_MAP, False),
+    )
+    device = CleanmateVacuum(host, auth_code, poll_policy)
 
     hass.data[DOMAIN][entry.entry_id]['device'] = device
-    
+    hass.data[DOMAIN][entry.entry_id]['scheduler'] = JobScheduler(device)
+
+    history = History(device)
+    store = Store(hass, HISTORY_STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.history")
+    if (stored := await store.async_load()) is not None:
+        try:
+            history.load(stored)
+        except (KeyError, TypeError, ValueError) as err:
+            _LOGGER.warning("Discarding invalid stored history: %s", err)
+
+    async def async_save_history(previous, state) -> None:
+        store.async_delay_save(history.as_dict, HISTORY_SAVE_DELAY)
+
+    device.add_state_listener(async_save_history)
+    hass.data[DOMAIN][entry.entry_id]['history'] = history
+    hass.data[DOMAIN][entry.entry_id]['history_store'] = store
+    hass.data[DOMAIN][entry.entry_id]['tile_map'] = TileMap()
+    hass.data[DOMAIN][entry.entry_id]['tile_map_lock'] = asyncio.Lock()
+
     hass.async_create_task(
         hass.config_entries.async_forward_entry_setup(entry, 'vacuum')
     )
     hass.async_create_task(
         hass.config_entries.async_forward_entry_setup(entry, 'number')
     )
+    hass.async_create_task(
+        hass.config_entries.async_forward_entry_setup(entry, 'sensor')
+    )
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
     return True
 
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload a config entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     # This is called when an entry/configured device is to be removed. The class
@@ -40,6 +91,8 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # details
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        data = hass.data[DOMAIN].pop(entry.entry_id)
+        await data['device'].close()
+        await data['history_store'].async_save(data['history'].as_dict())
 
     return unload_ok
\ No newline at end of file
@@ -7,10 +7,17 @@ import voluptuous as vol
 import ipaddress
 
 from homeassistant import config_entries, exceptions
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 
 from homeassistant.const import CONF_HOST
-from .const import DOMAIN, PORT, CONF_AUTH_CODE
+from .const import (
+    DOMAIN,
+    PORT,
+    CONF_AUTH_CODE,
+    CONF_MAP_REFRESH_INTERVAL,
+    CONF_ALWAYS_FETCH_MAP,
+    DEFAULT_MAP_REFRESH_INTERVAL,
+)
 from .helpers import host_available
 
 _LOGGER = logging.getLogger(__name__)
@@ -72,6 +79,44 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             step_id="user", data_schema=DATA_SCHEMA, errors=errors
         )
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler(config_entry)
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle Cleanmate options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self.config_entry = config_entry
+
+    async def async_step_init(self, user_input=None):
+        """Manage the polling options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_MAP_REFRESH_INTERVAL,
+                        default=options.get(
+                            CONF_MAP_REFRESH_INTERVAL, DEFAULT_MAP_REFRESH_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                    vol.Required(
+                        CONF_ALWAYS_FETCH_MAP,
+                        default=options.get(CONF_ALWAYS_FETCH_MAP, False),
+                    ): bool,
+                }
+            ),
+        )
+
 
 class InvalidHost(exceptions.HomeAssistantError):
     """Error to indicate there is an invalid hostname."""
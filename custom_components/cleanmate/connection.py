@@ -2,8 +2,36 @@
 
 import asyncio
 import json
+import logging
+import socket
+import time
+from typing import Optional
 from .helpers import parse_value
 
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds to wait for a connection or a response
+TIMEOUT = 10
+# Seconds between checks of an idle connection. The checks only look at
+# the socket, they send nothing.
+IDLE_TIMEOUT = 5
+# Seconds of inactivity after which the vacuum is sent a probe. Longer
+# than the scan interval, so regular polling never causes probes.
+PROBE_IDLE_TIMEOUT = 60
+# Seconds to wait for the answer to a probe
+PROBE_TIMEOUT = 3
+
+# Cheap request used to probe the connection
+PROBE_REQUEST = {"state": "", "transitCmd": "98"}
+
+# TCP keepalive: start probing after KEEPALIVE_IDLE seconds of silence,
+# probe every KEEPALIVE_INTERVAL seconds and give up after KEEPALIVE_COUNT
+# unanswered probes. A dead peer is noticed after about 11 seconds, well
+# within the scan interval, and the idle checks then replace the connection.
+KEEPALIVE_IDLE = 5
+KEEPALIVE_INTERVAL = 2
+KEEPALIVE_COUNT = 3
+
 
 class Connection:
     """Connection to a Cleanmate vacuum."""
@@ -13,32 +41,165 @@ class Connection:
     host: str
     auth_code: str
 
-    reader: asyncio.StreamReader
-    writer: asyncio.StreamWriter
+    reader: Optional[asyncio.StreamReader] = None
+    writer: Optional[asyncio.StreamWriter] = None
 
     def __init__(self, host: str, auth_code: str) -> None:
         self.host = host
         self.auth_code = auth_code
+        self.last_activity = 0.0
+        self._lock = asyncio.Lock()
+        self._awaiting_response = False
+        self._probed = False
+        self._closed = False
+        self._health_check: Optional[asyncio.TimerHandle] = None
+        self._health_check_task: Optional[asyncio.Task] = None
+
+    @property
+    def connected(self) -> bool:
+        """Whether the connection is open and has not been closed by the vacuum."""
+        if self.writer is None or self.reader is None:
+            return False
+        return not (
+            self.writer.is_closing()
+            or self.reader.at_eof()
+            or self.reader.exception() is not None
+        )
 
     async def connect(self) -> None:
         """Connect to the Cleanmate vacuum."""
-        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
-        self.writer.write_timeout = 10
-        self.writer.read_timeout = 10
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), TIMEOUT
+        )
+        self._set_keepalive(self.writer.get_extra_info("socket"))
+        self._awaiting_response = False
+        self.last_activity = time.monotonic()
 
     async def disconnect(self) -> None:
         """Disconnect from the Cleanmate vacuum."""
-        self.writer.close()
+        self._cancel_health_check()
+        if self.writer is not None:
+            self.writer.close()
         self.reader = None
         self.writer = None
 
+    async def close(self) -> None:
+        """Close the connection for good, stopping the health checks."""
+        self._closed = True
+        self._cancel_health_check()
+        task = self._health_check_task
+        if (
+            task is not None
+            and not task.done()
+            and task is not asyncio.current_task()
+        ):
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._health_check_task = None
+        await self.disconnect()
+
+    async def ensure_connected(self) -> None:
+        """Make sure there is a usable connection, reconnecting if needed.
+
+        A response left unread by an earlier command would be mistaken for
+        the answer to the next request, so such a connection is replaced too.
+        """
+        if self._closed:
+            raise ConnectionError("Connection is closed")
+        if self.connected and not self._awaiting_response:
+            return
+        await self.disconnect()
+        await self.connect()
+
+    async def check_health(self) -> None:
+        """Replace the connection if it is no longer usable.
+
+        Runs every IDLE_TIMEOUT seconds while the connection is idle. TCP
+        keepalive makes the OS fail a half-open connection, which these
+        checks notice without sending anything. Only when nothing has been
+        sent for PROBE_IDLE_TIMEOUT seconds is the vacuum sent a cheap state
+        request, once per idle period. A dead connection is replaced right
+        away, so the next poll does not pay for the reconnect.
+        """
+        self._health_check = None
+        if self._closed or self.writer is None:
+            return
+        idle = time.monotonic() - self.last_activity
+        if self._lock.locked() or idle < IDLE_TIMEOUT:
+            self._schedule_health_check(max(IDLE_TIMEOUT - idle, 0))
+            return
+        async with self._lock:
+            if self.connected and not self._awaiting_response:
+                if self._probed or idle < PROBE_IDLE_TIMEOUT:
+                    self._schedule_health_check()
+                    return
+                try:
+                    await self._send(self._build_packet(PROBE_REQUEST))
+                    await self.get_response(PROBE_TIMEOUT)
+                    self._probed = True
+                    return
+                except (OSError, asyncio.TimeoutError):
+                    pass
+            if self._closed:
+                return
+            _LOGGER.debug("Connection to %s is stale, reconnecting", self.host)
+            try:
+                await self.disconnect()
+                await self.connect()
+            except (OSError, asyncio.TimeoutError) as err:
+                _LOGGER.debug("Could not reconnect to %s: %s", self.host, err)
+                await self.disconnect()
+                return
+            self._probed = True
+            self._schedule_health_check()
+
+    def _set_keepalive(self, sock: Optional[socket.socket]) -> None:
+        """Enable TCP keepalive so a dead peer is detected by the OS."""
+        if sock is None:
+            return
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, KEEPALIVE_IDLE)
+        elif hasattr(socket, "TCP_KEEPALIVE"):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPALIVE, KEEPALIVE_IDLE)
+        if hasattr(socket, "TCP_KEEPINTVL"):
+            sock.setsockopt(
+                socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, KEEPALIVE_INTERVAL
+            )
+        if hasattr(socket, "TCP_KEEPCNT"):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, KEEPALIVE_COUNT)
+        if hasattr(socket, "TCP_USER_TIMEOUT"):
+            # Also fail writes that stay unacknowledged
+            sock.setsockopt(
+                socket.IPPROTO_TCP, socket.TCP_USER_TIMEOUT, TIMEOUT * 1000
+            )
+
+    def _schedule_health_check(self, delay: float = IDLE_TIMEOUT) -> None:
+        self._cancel_health_check()
+        if self._closed:
+            return
+        loop = asyncio.get_running_loop()
+        self._health_check = loop.call_later(delay, self._run_health_check)
+
+    def _run_health_check(self) -> None:
+        self._health_check_task = asyncio.get_running_loop().create_task(
+            self.check_health()
+        )
+
+    def _cancel_health_check(self) -> None:
+        if self._health_check is not None:
+            self._health_check.cancel()
+            self._health_check = None
+
     def _get_request_prefix(self, size: int) -> str:
         size_hex = "{0:x}".format(size)
         temp = f"{'0'*(8-len(size_hex))}{size_hex}"
         return "".join(map(str.__add__, temp[-2::-2], temp[-1::-2]))
 
-    async def send_request(self, data: dict[str, any]) -> None:
-        """Send a request to the Cleanmate vacuum."""
+    def _build_packet(self, data: dict[str, any]) -> bytes:
         request = json.dumps(
             {
                 "version": "1.0",
@@ -55,24 +216,55 @@ class Connection:
         prefix = self._get_request_prefix(request_size)
 
         packet = f"{prefix}fa00000001000000c527000001000000{request_hex}"
-        await self.send_raw_request(bytes.fromhex(packet))
+        return bytes.fromhex(packet)
+
+    async def send_request(self, data: dict[str, any]) -> None:
+        """Send a request to the Cleanmate vacuum, discarding its response."""
+        await self.send_raw_request(self._build_packet(data))
+
+    async def request(self, data: dict[str, any]):
+        """Send a request to the Cleanmate vacuum and return its response."""
+        async with self._lock:
+            self._probed = False
+            await self._send(self._build_packet(data))
+            return await self.get_response()
 
     async def send_raw_request(self, raw_data: bytes) -> None:
-        """Send a raw request to the Cleanmate vacuum."""
-        await self.connect()
-        self.writer.write(raw_data)
-        await self.writer.drain()
-
-    async def read_data(self, bytes: int) -> bytes:
-        data = await self.reader.read(bytes)
-        if(not data): 
-            raise ConnectionError
-        return data
-    
-    async def get_response(self):
+        """Send a raw request to the Cleanmate vacuum, discarding its response."""
+        async with self._lock:
+            self._probed = False
+            await self._send(raw_data)
+            try:
+                # Read the reply so the connection can be reused
+                await self.get_response()
+            except (OSError, asyncio.TimeoutError) as err:
+                # The request was sent, only the connection is lost
+                _LOGGER.debug("No response to command from %s: %s", self.host, err)
+
+    async def _send(self, raw_data: bytes) -> None:
+        """Send data, retrying once on a fresh connection if the old one is dead."""
+        await self.ensure_connected()
+        try:
+            self.writer.write(raw_data)
+            await asyncio.wait_for(self.writer.drain(), TIMEOUT)
+        except (OSError, asyncio.TimeoutError):
+            await self.disconnect()
+            await self.connect()
+            self.writer.write(raw_data)
+            await asyncio.wait_for(self.writer.drain(), TIMEOUT)
+        self._awaiting_response = True
+        self.last_activity = time.monotonic()
+
+    async def read_data(self, bytes: int, timeout: float = TIMEOUT) -> bytes:
+        try:
+            return await asyncio.wait_for(self.reader.readexactly(bytes), timeout)
+        except asyncio.IncompleteReadError as err:
+            raise ConnectionError from err
+
+    async def get_response(self, timeout: float = TIMEOUT):
         try:
             # Read size from header
-            header = await self.read_data(20)
+            header = await self.read_data(20, timeout)
 
             raw_size_hex = header[:4].hex()
 
@@ -85,10 +277,13 @@ class Connection:
             )  # Minus the header that we already gathered
 
             # Read actual data
-            data = b""
-            while len(data) < size:
-                data += await self.read_data(size)
+            data = await self.read_data(size, timeout)
             response = parse_value(data.decode("ascii"))
-            return response
-        except asyncio.TimeoutError as err:
-            raise err
+        except (OSError, asyncio.TimeoutError):
+            # The connection is in an unknown state, start over next time
+            await self.disconnect()
+            raise
+        self._awaiting_response = False
+        self.last_activity = time.monotonic()
+        self._schedule_health_check()
+        return response
@@ -4,3 +4,11 @@ DOMAIN = "cleanmate"
 PORT = 8888
 
 CONF_AUTH_CODE = "authCode"
+CONF_MAP_REFRESH_INTERVAL = "map_refresh_interval"
+CONF_ALWAYS_FETCH_MAP = "always_fetch_map"
+
+DEFAULT_MAP_REFRESH_INTERVAL = 600
+
+HISTORY_STORAGE_VERSION = 1
+# Seconds to wait before writing the history to disk
+HISTORY_SAVE_DELAY = 300
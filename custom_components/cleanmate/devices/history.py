@@ -0,0 +1,286 @@
+"""In-memory history of a Cleanmate vacuum's state."""
+from __future__ import annotations
+
+from array import array
+import base64
+from bisect import bisect_left
+import time
+from typing import Optional
+
+from .vacuum import CleanmateVacuum, VacuumState, WorkState
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+# Number of cleaning sessions that are kept
+SESSION_HISTORY = 100
+
+# Seconds without samples after which an open session is dropped
+OPEN_SESSION_GAP = 10 * MINUTE
+
+# Stored instead of a missing battery level
+NO_BATTERY = -1
+
+
+class Tier:
+    """Samples of battery level, work state and error code.
+
+    Samples are kept in parallel arrays. With a resolution, only the last
+    sample of every resolution-sized bucket is kept. Samples older than
+    the retention are dropped.
+    """
+
+    __slots__ = (
+        "resolution",
+        "retention",
+        "times",
+        "battery",
+        "work_state",
+        "error",
+    )
+
+    def __init__(self, resolution: int, retention: int) -> None:
+        self.resolution = resolution
+        self.retention = retention
+        self.times = array("d")
+        self.battery = array("b")
+        self.work_state = array("B")
+        self.error = array("H")
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def append(
+        self, timestamp: float, battery: int, work_state: int, error: int
+    ) -> None:
+        """Add a sample, replacing the last one if it is in the same bucket."""
+        if (
+            self.resolution
+            and self.times
+            and timestamp // self.resolution == self.times[-1] // self.resolution
+        ):
+            self.times[-1] = timestamp
+            self.battery[-1] = battery
+            self.work_state[-1] = work_state
+            self.error[-1] = error
+        else:
+            self.times.append(timestamp)
+            self.battery.append(battery)
+            self.work_state.append(work_state)
+            self.error.append(error)
+        self._trim(timestamp - self.retention)
+
+    def _trim(self, oldest: float) -> None:
+        count = bisect_left(self.times, oldest)
+        if count:
+            for column in (self.times, self.battery, self.work_state, self.error):
+                del column[:count]
+
+    def as_dict(self) -> dict:
+        """Return the samples in a compact, JSON serializable form."""
+        return {
+            "times": _encode(self.times),
+            "battery": _encode(self.battery),
+            "work_state": _encode(self.work_state),
+            "error": _encode(self.error),
+        }
+
+    def load(self, data: dict) -> None:
+        """Restore samples from as_dict output."""
+        columns = (
+            _decode("d", data["times"]),
+            _decode("b", data["battery"]),
+            _decode("B", data["work_state"]),
+            _decode("H", data["error"]),
+        )
+        _check_lengths(columns)
+        self.times, self.battery, self.work_state, self.error = columns
+
+
+class History:
+    """Tiered history of a vacuum and its cleaning sessions.
+
+    Raw samples are kept for an hour, one per minute for a day and one
+    per hour for a month.
+    """
+
+    def __init__(self, device: CleanmateVacuum) -> None:
+        self.tiers: dict[str, Tier] = {
+            "raw": Tier(0, HOUR),
+            "minute": Tier(MINUTE, DAY),
+            "hour": Tier(HOUR, 30 * DAY),
+        }
+        # Finished sessions: start, end, battery level at start and lowest
+        # battery level during the session
+        self.session_start = array("d")
+        self.session_end = array("d")
+        self.session_start_battery = array("b")
+        self.session_lowest_battery = array("b")
+        # Times at which an error was first reported
+        self.errors = array("d")
+        # Start, battery level at start and lowest battery level so far
+        self._open_session: Optional[tuple[float, int, int]] = None
+        device.add_state_listener(self.async_handle_state)
+
+    async def async_handle_state(
+        self, previous: VacuumState, state: VacuumState
+    ) -> None:
+        """Record a new state snapshot."""
+        self.record(previous, state, time.time())
+
+    def record(
+        self, previous: VacuumState, state: VacuumState, timestamp: float
+    ) -> None:
+        """Record a state snapshot taken at timestamp."""
+        raw = self.tiers["raw"]
+        if (
+            self._open_session is not None
+            and raw.times
+            and timestamp - raw.times[-1] > OPEN_SESSION_GAP
+        ):
+            # Not polled for a while, e.g. Home Assistant was stopped. The
+            # session's end is unknown, so it is dropped.
+            self._open_session = None
+
+        battery = _battery(state)
+        work_state = (state.work_state or WorkState.Unknown).value
+        error = _error(state)
+        for tier in self.tiers.values():
+            tier.append(timestamp, battery, work_state, error)
+
+        if error and error != _error(previous):
+            self.errors.append(timestamp)
+            _trim(self.errors, timestamp - 30 * DAY)
+
+        session = self._open_session
+        if session is None:
+            if state.work_state is WorkState.Cleaning:
+                self._open_session = (timestamp, battery, battery)
+        elif state.work_state is WorkState.Cleaning or state.had_work:
+            start, start_battery, lowest_battery = session
+            if battery != NO_BATTERY and (
+                lowest_battery == NO_BATTERY or battery < lowest_battery
+            ):
+                self._open_session = (start, start_battery, battery)
+        else:
+            start, start_battery, lowest_battery = session
+            if battery != NO_BATTERY and (
+                lowest_battery == NO_BATTERY or battery < lowest_battery
+            ):
+                lowest_battery = battery
+            self._open_session = None
+            self.session_start.append(start)
+            self.session_end.append(timestamp)
+            self.session_start_battery.append(start_battery)
+            self.session_lowest_battery.append(lowest_battery)
+            excess = len(self.session_start) - SESSION_HISTORY
+            if excess > 0:
+                for column in self._session_columns():
+                    del column[:excess]
+
+    @property
+    def last_session_duration(self) -> Optional[float]:
+        """Seconds the last finished cleaning session took."""
+        if not self.session_start:
+            return None
+        return self.session_end[-1] - self.session_start[-1]
+
+    @property
+    def last_session_battery_used(self) -> Optional[int]:
+        """Battery percentage used by the last finished cleaning session."""
+        if not self.session_start:
+            return None
+        start = self.session_start_battery[-1]
+        end = self.session_lowest_battery[-1]
+        if NO_BATTERY in (start, end):
+            return None
+        return max(start - end, 0)
+
+    def error_count(self, period: float, now: Optional[float] = None) -> int:
+        """Number of errors reported during the last period seconds."""
+        oldest = (now if now is not None else time.time()) - period
+        return len(self.errors) - bisect_left(self.errors, oldest)
+
+    def as_dict(self) -> dict:
+        """Return the history in a compact, JSON serializable form."""
+        return {
+            "tiers": {name: tier.as_dict() for name, tier in self.tiers.items()},
+            "sessions": [_encode(column) for column in self._session_columns()],
+            "errors": _encode(self.errors),
+            "open_session": self._open_session,
+        }
+
+    def load(self, data: dict) -> None:
+        """Restore the history from as_dict output.
+
+        Raises KeyError, TypeError or ValueError if the data is not valid,
+        in which case the history is left unchanged.
+        """
+        tiers = {}
+        for name, tier in self.tiers.items():
+            tiers[name] = Tier(tier.resolution, tier.retention)
+            tiers[name].load(data["tiers"][name])
+        sessions = tuple(
+            _decode(column.typecode, encoded)
+            for column, encoded in zip(
+                self._session_columns(), data["sessions"], strict=True
+            )
+        )
+        _check_lengths(sessions)
+        errors = _decode("d", data["errors"])
+        open_session = data.get("open_session")
+        if open_session is not None:
+            start, start_battery, lowest_battery = open_session
+            open_session = (float(start), int(start_battery), int(lowest_battery))
+
+        self.tiers = tiers
+        (
+            self.session_start,
+            self.session_end,
+            self.session_start_battery,
+            self.session_lowest_battery,
+        ) = sessions
+        self.errors = errors
+        self._open_session = open_session
+
+    def _session_columns(self) -> tuple[array, ...]:
+        return (
+            self.session_start,
+            self.session_end,
+            self.session_start_battery,
+            self.session_lowest_battery,
+        )
+
+
+def _battery(state: VacuumState) -> int:
+    try:
+        return max(min(int(state.battery_level), 100), 0)
+    except (TypeError, ValueError):
+        return NO_BATTERY
+
+
+def _error(state: VacuumState) -> int:
+    try:
+        return max(min(int(state.error_code), 0xFFFF), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _check_lengths(columns: tuple[array, ...]) -> None:
+    if len({len(column) for column in columns}) > 1:
+        raise ValueError("Columns have different lengths")
+
+
+def _trim(column: array, oldest: float) -> None:
+    del column[:bisect_left(column, oldest)]
+
+
+def _encode(column: array) -> str:
+    return base64.b64encode(column.tobytes()).decode("ascii")
+
+
+def _decode(typecode: str, encoded: str) -> array:
+    column = array(typecode)
+    column.frombytes(base64.b64decode(encoded))
+    return column
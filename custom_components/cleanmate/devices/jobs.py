@@ -0,0 +1,157 @@
+"""Sequenced cleaning jobs for a Cleanmate vacuum."""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import itertools
+import logging
+import time
+from typing import Optional
+
+from .vacuum import CleanmateVacuum, MopMode, VacuumState, WorkMode, WorkState
+
+_LOGGER = logging.getLogger(__name__)
+
+# Number of finished jobs kept for the queue status
+FINISHED_HISTORY = 10
+# Seconds to wait for the vacuum to start cleaning a sent job
+START_TIMEOUT = 300
+
+
+@dataclass(slots=True)
+class CleaningJob:
+    """A set of rooms to clean with a given work and mop mode."""
+
+    rooms: list[dict]
+    work_mode: Optional[WorkMode] = None
+    mop_mode: Optional[MopMode] = None
+    id: int = 0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    seen_cleaning: bool = field(default=False, repr=False)
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Seconds the job has been (or was) running."""
+        if self.started_at is None:
+            return None
+        end = self.finished_at if self.finished_at is not None else time.time()
+        return end - self.started_at
+
+    def as_dict(self) -> dict:
+        """Return the job as a status dictionary.
+
+        Only fixed values are included, so the status does not change on
+        every poll while a job is running.
+        """
+        finished = self.finished_at is not None and self.started_at is not None
+        return {
+            "id": self.id,
+            "rooms": [room["room_id"] for room in self.rooms],
+            "work_mode": self.work_mode.name if self.work_mode else None,
+            "mop_mode": self.mop_mode.name if self.mop_mode else None,
+            "started_at": _isoformat(self.started_at),
+            "finished_at": _isoformat(self.finished_at),
+            "duration": round(self.duration) if finished else None,
+        }
+
+
+def _isoformat(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+class JobScheduler:
+    """Queue of cleaning jobs, advanced by the regular state polls.
+
+    A job is finished once the vacuum has been seen cleaning it and then
+    reports that it is no longer working on it (``hadWork`` cleared and
+    not cleaning). Pausing, returning to charge mid-job and errors keep
+    ``hadWork`` set and therefore keep the job running.
+    """
+
+    def __init__(self, device: CleanmateVacuum) -> None:
+        self.device = device
+        self.pending: deque[CleaningJob] = deque()
+        self.current: Optional[CleaningJob] = None
+        self.finished: deque[CleaningJob] = deque(maxlen=FINISHED_HISTORY)
+        self._ids = itertools.count(1)
+        device.add_state_listener(self.async_handle_state)
+
+    @property
+    def status(self) -> dict:
+        """Return the queue status."""
+        return {
+            "current": self.current.as_dict() if self.current else None,
+            "pending": [job.as_dict() for job in self.pending],
+            "finished": [job.as_dict() for job in self.finished],
+        }
+
+    async def add(self, job: CleaningJob) -> None:
+        """Queue a job, starting it right away if the vacuum is available."""
+        job.id = next(self._ids)
+        self.pending.append(job)
+        if self.current is None and self._is_available(self.device.state):
+            await self._start_next()
+
+    def clear(self) -> None:
+        """Drop all pending jobs. A running job is left to finish."""
+        self.pending.clear()
+
+    async def async_handle_state(
+        self, previous: VacuumState, state: VacuumState
+    ) -> None:
+        """Advance the queue on a new state snapshot."""
+        job = self.current
+        if job is not None:
+            if state.work_state is WorkState.Cleaning:
+                job.seen_cleaning = True
+            elif job.seen_cleaning and not state.had_work:
+                self._finish(job)
+                _LOGGER.debug("Cleaning job %s finished", job.id)
+            elif not job.seen_cleaning and job.duration > START_TIMEOUT:
+                self._finish(job)
+                _LOGGER.warning("Cleaning job %s was never started", job.id)
+        if self.current is None and self.pending and self._is_available(state):
+            await self._start_next()
+
+    def _finish(self, job: CleaningJob) -> None:
+        """Move the current job to the finished jobs."""
+        job.finished_at = time.time()
+        self.finished.append(job)
+        self.current = None
+
+    @staticmethod
+    def _is_available(state: VacuumState) -> bool:
+        """Whether the vacuum can take a new job."""
+        if state.had_work:
+            return False
+        return state.work_state in (
+            WorkState.Idle,
+            WorkState.Returning,
+            WorkState.Charging,
+            WorkState.Docked,
+        )
+
+    async def _start_next(self) -> None:
+        """Send the next pending job to the vacuum."""
+        job = self.pending.popleft()
+        self.current = job
+        job.started_at = time.time()
+        _LOGGER.debug("Starting cleaning job %s", job.id)
+        state = self.device.state
+        try:
+            if job.mop_mode is not None and job.mop_mode is not state.mop_mode:
+                await self.device.set_mop_mode(job.mop_mode)
+            await self.device.clean_rooms(job.rooms)
+            if job.work_mode is not None and job.work_mode is not state.work_mode:
+                await self.device.start(job.work_mode)
+        except (OSError, asyncio.TimeoutError) as err:
+            # Keep the job first in line and try again on a later poll
+            job.started_at = None
+            self.current = None
+            self.pending.appendleft(job)
+            _LOGGER.warning("Could not start cleaning job %s: %s", job.id, err)
@@ -0,0 +1,205 @@
+"""Tile based rendering of a Cleanmate map."""
+from __future__ import annotations
+
+import hashlib
+import secrets
+import struct
+from typing import Iterable, Optional
+import zlib
+
+from .vacuum import MapData
+
+# Width and height of a tile in map cells
+TILE_SIZE = 32
+
+# Palette index of every map cell value, overlays use the indexes after them
+CELL_UNKNOWN = 0
+CELL_FLOOR = 1
+CELL_WALL = 2
+ROBOT = 3
+CHARGER = 4
+
+PALETTE = bytes(
+    (
+        0x00, 0x00, 0x00,  # unknown
+        0xD8, 0xE6, 0xF0,  # floor
+        0x4A, 0x5A, 0x6A,  # wall
+        0x1E, 0x88, 0xE5,  # robot
+        0x43, 0xA0, 0x47,  # charger
+    )
+)
+# Unknown cells are transparent
+TRANSPARENCY = bytes((0x00,))
+# Map cell values outside the palette are drawn as unknown
+CELL_TABLE = bytes((CELL_UNKNOWN, CELL_FLOOR, CELL_WALL)) + bytes(253)
+
+
+def encode_png(pixels: bytes, width: int, height: int) -> bytes:
+    """Encode palette indexes, one byte per pixel, as a PNG image."""
+    raw = b"".join(
+        b"\x00" + pixels[row * width:(row + 1) * width] for row in range(height)
+    )
+    return b"".join(
+        (
+            b"\x89PNG\r\n\x1a\n",
+            _chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 3, 0, 0, 0)),
+            _chunk(b"PLTE", PALETTE),
+            _chunk(b"tRNS", TRANSPARENCY),
+            _chunk(b"IDAT", zlib.compress(raw, 6)),
+            _chunk(b"IEND", b""),
+        )
+    )
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    return (
+        struct.pack(">I", len(data))
+        + kind
+        + data
+        + struct.pack(">I", zlib.crc32(kind + data))
+    )
+
+
+def render_cells(
+    grid: bytes,
+    width: int,
+    robot_position: Optional[tuple[int, int]] = None,
+    charger_position: Optional[tuple[int, int]] = None,
+) -> bytes:
+    """Return the grid as palette indexes with the robot and charger drawn."""
+    cells = bytearray(grid.translate(CELL_TABLE))
+    height = len(grid) // width if width else 0
+    for position, index in ((charger_position, CHARGER), (robot_position, ROBOT)):
+        if position is None:
+            continue
+        x, y = position
+        if 0 <= x < width and 0 <= y < height:
+            cells[y * width + x] = index
+    return bytes(cells)
+
+
+class TileMap:
+    """Encoded tiles of a map, re-encoded only when they change.
+
+    The cells are compared with the previous update to find the tiles that
+    may have changed. Only those are hashed, and a tile is re-encoded when
+    its hash differs from the one it was last encoded with.
+
+    Every update gets a new version. Each tile remembers the version it
+    last changed in, so clients can ask for the tiles changed since the
+    version they already have. Versions restart when the tile map is
+    recreated, so each instance has a random epoch that clients must match
+    for their version to be meaningful.
+    """
+
+    def __init__(self, tile_size: int = TILE_SIZE) -> None:
+        self.tile_size = tile_size
+        self.width = 0
+        self.height = 0
+        self.epoch = secrets.token_hex(8)
+        self.version = 0
+        # The map snapshot the tiles were last rendered from
+        self.source = None
+        self._cells: Optional[bytes] = None
+        self._hashes: dict[tuple[int, int], bytes] = {}
+        self._versions: dict[tuple[int, int], int] = {}
+        self._images: dict[tuple[int, int], bytes] = {}
+
+    @property
+    def columns(self) -> int:
+        """Number of tile columns."""
+        return -(-self.width // self.tile_size)
+
+    @property
+    def rows(self) -> int:
+        """Number of tile rows."""
+        return -(-self.height // self.tile_size)
+
+    def update(
+        self, cells: bytes, width: int, height: int
+    ) -> list[tuple[int, int]]:
+        """Update the map and return the tiles that changed."""
+        previous = self._cells
+        if (width, height) != (self.width, self.height):
+            self.width, self.height = width, height
+            previous = None
+            self._hashes.clear()
+            self._versions.clear()
+            self._images.clear()
+        self._cells = cells
+        self.version += 1
+
+        if previous is None:
+            tiles = self._tiles()
+        else:
+            tiles = self._changed_tiles(previous, cells)
+        changed = []
+        for tile in tiles:
+            pixels, tile_width, tile_height = self._crop(cells, *tile)
+            digest = hashlib.blake2b(pixels, digest_size=8).digest()
+            if self._hashes.get(tile) == digest:
+                continue
+            self._hashes[tile] = digest
+            self._versions[tile] = self.version
+            self._images[tile] = encode_png(pixels, tile_width, tile_height)
+            changed.append(tile)
+        return changed
+
+    def update_map(self, map_data: MapData) -> None:
+        """Render a map snapshot, unless it is the one rendered last."""
+        if map_data is self.source or map_data.grid is None:
+            return
+        self.source = map_data
+        cells = render_cells(
+            map_data.grid,
+            map_data.width,
+            map_data.robot_position and map_data.robot_position.as_tuple(),
+            map_data.charger_position and map_data.charger_position.as_tuple(),
+        )
+        self.update(cells, map_data.width, map_data.height)
+
+    def tiles_since(self, version: int) -> Iterable[tuple[int, int, bytes]]:
+        """Return the encoded tiles that changed after version."""
+        for tile, tile_version in self._versions.items():
+            if tile_version > version:
+                yield (*tile, self._images[tile])
+
+    def _tiles(self) -> Iterable[tuple[int, int]]:
+        for row in range(self.rows):
+            for column in range(self.columns):
+                yield (column, row)
+
+    def _changed_tiles(
+        self, previous: bytes, cells: bytes
+    ) -> Iterable[tuple[int, int]]:
+        """Return the tiles whose cells differ between two updates."""
+        size, width = self.tile_size, self.width
+        band = size * width
+        for row in range(self.rows):
+            # Compare a whole row of tiles first, most of them are unchanged
+            top, bottom = row * band, (row + 1) * band
+            if cells[top:bottom] == previous[top:bottom]:
+                continue
+            changed = set()
+            for y in range(row * size, min((row + 1) * size, self.height)):
+                start = y * width
+                if cells[start:start + width] == previous[start:start + width]:
+                    continue
+                for column in range(self.columns):
+                    left = start + column * size
+                    if cells[left:left + size] != previous[left:left + size]:
+                        changed.add(column)
+            for column in sorted(changed):
+                yield (column, row)
+
+    def _crop(self, cells: bytes, column: int, row: int) -> tuple[bytes, int, int]:
+        """Return the pixels of a tile and its size."""
+        size = self.tile_size
+        left, top = column * size, row * size
+        tile_width = min(size, self.width - left)
+        tile_height = min(size, self.height - top)
+        pixels = b"".join(
+            cells[y * self.width + left:y * self.width + left + tile_width]
+            for y in range(top, top + tile_height)
+        )
+        return pixels, tile_width, tile_height
@@ -1,8 +1,16 @@
 """A Cleanmate vacuum."""
+from __future__ import annotations
+
 import base64
+from dataclasses import dataclass
 from enum import Enum
-from typing import Tuple
+import logging
+import time
+from typing import Awaitable, Callable, Optional, Tuple
 from ..connection import Connection
+from ..const import DEFAULT_MAP_REFRESH_INTERVAL
+
+_LOGGER = logging.getLogger(__name__)
 
 class WorkMode(Enum):
     """The cleaning intensity."""
@@ -47,55 +55,273 @@ class ErrorCode(Enum):
     LocalizationFailed = 119
 
 
+@dataclass(frozen=True, slots=True)
+class Position:
+    """A point on the map."""
+
+    x: int
+    y: int
+
+    @classmethod
+    def from_value(cls, value) -> Optional[Position]:
+        """Create a position from a parsed ``x,y`` value."""
+        try:
+            x, y = value[:2]
+            return cls(int(x), int(y))
+        except (TypeError, ValueError):
+            return None
+
+    def as_tuple(self) -> Tuple[int, int]:
+        """Return the position as a tuple."""
+        return (self.x, self.y)
+
+
+@dataclass(frozen=True, slots=True)
+class Room:
+    """A room (region) on the map."""
+
+    id: int
+    name: str
+
+    @classmethod
+    def from_value(cls, value: dict) -> Room:
+        """Create a room from a ``regionNames`` entry."""
+        name = base64.b64decode(value["regionName"]).decode("utf-8")
+        return cls(int(value["regionNum"]), name)
+
+
+@dataclass(frozen=True, slots=True)
+class VacuumState:
+    """Immutable snapshot of the state response."""
+
+    battery_level: Optional[int] = None
+    version: Optional[str] = None
+    work_mode: Optional[WorkMode] = None
+    work_state: Optional[WorkState] = None
+    had_work: bool = False
+    mop_mode: Optional[MopMode] = None
+    volume: Optional[int] = None
+    error_code: Optional[int] = None
+
+    @classmethod
+    def from_value(cls, value: dict, previous: VacuumState) -> VacuumState:
+        """Create a state snapshot, keeping previous values for missing keys."""
+        ext_param = value.get("extParam")
+        had_work = previous.had_work
+        if isinstance(ext_param, dict) and "hadWork" in ext_param:
+            had_work = ext_param["hadWork"]
+        return cls(
+            battery_level=value.get("battery", previous.battery_level),
+            version=value.get("version", previous.version),
+            work_mode=_to_enum(WorkMode, value.get("workMode")),
+            work_state=_to_enum(WorkState, value.get("workState")),
+            had_work=had_work,
+            mop_mode=_to_enum(MopMode, value.get("waterTank")),
+            volume=value.get("volume", previous.volume),
+            error_code=value.get("error", previous.error_code),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class MapData:
+    """Immutable snapshot of the map response."""
+
+    rooms: Tuple[Room, ...] = ()
+    charger_position: Optional[Position] = None
+    robot_position: Optional[Position] = None
+    # One byte per map cell, row by row
+    width: int = 0
+    height: int = 0
+    grid: Optional[bytes] = None
+
+    @classmethod
+    def from_value(cls, value: dict, previous: MapData) -> MapData:
+        """Create a map snapshot, keeping previous values for missing keys."""
+        rooms = previous.rooms
+        if "regionNames" in value:
+            rooms = tuple(Room.from_value(room) for room in value["regionNames"])
+        charger_position = previous.charger_position
+        if "chargerPos" in value:
+            charger_position = Position.from_value(value["chargerPos"])
+        robot_position = previous.robot_position
+        if "robotPos" in value:
+            robot_position = Position.from_value(value["robotPos"])
+        width, height, grid = previous.width, previous.height, previous.grid
+        if "map" in value:
+            width, height, grid = _decode_grid(value)
+        return cls(rooms, charger_position, robot_position, width, height, grid)
+
+
+def _decode_grid(value: dict) -> Tuple[int, int, Optional[bytes]]:
+    """Decode the base64 map grid of a map response."""
+    try:
+        width = int(value["mapWidth"])
+        height = int(value["mapHeight"])
+        grid = base64.b64decode(value["map"])
+    except (KeyError, TypeError, ValueError):
+        return 0, 0, None
+    if width <= 0 or len(grid) != width * height:
+        return 0, 0, None
+    return width, height, grid
+
+
+def _to_enum(enum: type[Enum], value) -> Enum:
+    """Convert a raw value to an enum member, falling back to Unknown."""
+    try:
+        return enum(value)
+    except (TypeError, ValueError):
+        return enum.Unknown
+
+
+@dataclass(frozen=True, slots=True)
+class PollPolicy:
+    """When to fetch map data along with the state."""
+
+    # Map and position only change while the vacuum is moving
+    map_work_states: frozenset[WorkState] = frozenset(
+        {WorkState.Cleaning, WorkState.Returning}
+    )
+    # Seconds between map refreshes while the vacuum is not moving
+    map_refresh_interval: float = DEFAULT_MAP_REFRESH_INTERVAL
+    # Fetch the map on every poll, regardless of the work state
+    always_fetch_map: bool = False
+
+    def should_fetch_map(
+        self, previous: VacuumState, state: VacuumState, map_age: float
+    ) -> bool:
+        """Whether the map should be fetched after a state update."""
+        if self.always_fetch_map or map_age >= self.map_refresh_interval:
+            return True
+        # Keep fetching on the poll after the vacuum stopped to get its final position
+        return (
+            state.work_state in self.map_work_states
+            or previous.work_state in self.map_work_states
+        )
+
+
+@dataclass(slots=True)
+class PollStatistics:
+    """Number of requests made by the polls."""
+
+    polls: int = 0
+    state_requests: int = 0
+    map_requests: int = 0
+    map_requests_skipped: int = 0
+
+
+StateListener = Callable[[VacuumState, VacuumState], Awaitable[None]]
+
+
 class CleanmateVacuum(Connection):
     """A Cleanmate vacuum."""
 
-    # Values from state response
-    battery_level: int = None
-    version: str = None
-    work_mode: WorkMode = None
-    work_state: WorkState = None
-    had_work: bool = False
-    mop_mode: MopMode = None
-    volume: int = None
-    error_code: int = None
+    # Latest snapshots, replaced as a whole on every update
+    state: VacuumState
+    map_data: MapData
+
+    def __init__(
+        self, host: str, auth_code: str, poll_policy: Optional[PollPolicy] = None
+    ) -> None:
+        super().__init__(host, auth_code)
+        self.state = VacuumState()
+        self.map_data = MapData()
+        self.poll_policy = poll_policy or PollPolicy()
+        self.poll_statistics = PollStatistics()
+        self._map_updated_at: Optional[float] = None
+        self._state_listeners: list[StateListener] = []
+
+    def add_state_listener(self, listener: StateListener) -> None:
+        """Call listener with the previous and new state after every state update."""
+        self._state_listeners.append(listener)
+
+    @property
+    def battery_level(self) -> Optional[int]:
+        """Battery level from the current state snapshot."""
+        return self.state.battery_level
+
+    @property
+    def version(self) -> Optional[str]:
+        """Firmware version from the current state snapshot."""
+        return self.state.version
+
+    @property
+    def work_mode(self) -> Optional[WorkMode]:
+        """Work mode from the current state snapshot."""
+        return self.state.work_mode
+
+    @property
+    def work_state(self) -> Optional[WorkState]:
+        """Work state from the current state snapshot."""
+        return self.state.work_state
+
+    @property
+    def had_work(self) -> bool:
+        """Whether a cleaning job was interrupted, from the current state snapshot."""
+        return self.state.had_work
 
-    # Values from map response
-    rooms: list = []
-    charger_position: Tuple[int, int] = ()
-    robot_position: Tuple[int, int] = ()
+    @property
+    def mop_mode(self) -> Optional[MopMode]:
+        """Mop mode from the current state snapshot."""
+        return self.state.mop_mode
+
+    @property
+    def volume(self) -> Optional[int]:
+        """Volume from the current state snapshot."""
+        return self.state.volume
+
+    @property
+    def error_code(self) -> Optional[int]:
+        """Error code from the current state snapshot."""
+        return self.state.error_code
+
+    @property
+    def rooms(self) -> Tuple[Room, ...]:
+        """Rooms from the current map snapshot."""
+        return self.map_data.rooms
+
+    @property
+    def charger_position(self) -> Optional[Position]:
+        """Charger position from the current map snapshot."""
+        return self.map_data.charger_position
+
+    @property
+    def robot_position(self) -> Optional[Position]:
+        """Robot position from the current map snapshot."""
+        return self.map_data.robot_position
+
+    async def update(self) -> None:
+        """Update the state, and the map when the poll policy asks for it."""
+        statistics = self.poll_statistics
+        statistics.polls += 1
+        previous = self.state
+        await self.update_state()
+        statistics.state_requests += 1
+        if self._map_updated_at is None:
+            map_age = float("inf")
+        else:
+            map_age = time.monotonic() - self._map_updated_at
+        if self.poll_policy.should_fetch_map(previous, self.state, map_age):
+            await self.update_map_data()
+            statistics.map_requests += 1
+        else:
+            statistics.map_requests_skipped += 1
 
     async def get_state_data(self) -> dict:
         """Get state data of the vacuum."""
         data = {"state": "", "transitCmd": "98"}
-        await self.send_request(data)
-        state_data = await self.get_response()
+        state_data = await self.request(data)
         return state_data
 
     async def update_state(self) -> None:
         """Get and update state of the vacuum."""
         state_value = (await self.get_state_data())["value"]
-        if "battery" in state_value:
-            self.battery_level = state_value["battery"]
-        if "version" in state_value:
-            self.version = state_value["version"]
-        if "extParam" in state_value and "hadWork" in state_value["extParam"]:
-            self.had_work = state_value["extParam"]["hadWork"]
-        if "error" in state_value:
-            self.error_code = state_value["error"]
-
-        try:
-            self.work_mode = WorkMode(state_value["workMode"])
-        except:
-            self.work_mode = WorkMode.Unknown
-        try:
-            self.work_state = WorkState(state_value["workState"])
-        except:
-            self.work_state = WorkState.Unknown
-        try:
-            self.mop_mode = MopMode(state_value["waterTank"])
-        except:
-            self.mop_mode = MopMode.Unknown
+        previous = self.state
+        self.state = VacuumState.from_value(state_value, previous)
+        for listener in self._state_listeners:
+            try:
+                await listener(previous, self.state)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error in state listener %s", listener)
 
     async def get_map_data(self) -> dict:
         """Get map data of the vacuum."""
@@ -107,22 +333,14 @@ class CleanmateVacuum(Connection):
             "mapSign": "AAA=",
             "transitCmd": "133",
         }
-        await self.send_request(data)
-        map_data = await self.get_response()
+        map_data = await self.request(data)
         return map_data
     
     async def update_map_data(self) -> None:
         """Get and update map data of the vacuum."""
         map_value = (await self.get_map_data())["value"]
-        if "regionNames" in map_value:
-            for room in map_value["regionNames"]:
-                region_name = base64.b64decode(room["regionName"]).decode("utf-8")
-                room["regionName"] = region_name
-            self.rooms = map_value["regionNames"]
-        if "chargerPos" in map_value:
-            self.charger_position = map_value["chargerPos"]
-        if "robotPos" in map_value:
-            self.robot_position = map_value["robotPos"]
+        self.map_data = MapData.from_value(map_value, self.map_data)
+        self._map_updated_at = time.monotonic()
 
     async def start(self, work_mode: WorkMode = None) -> None:
         """Start cleaning."""
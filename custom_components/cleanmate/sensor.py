@@ -0,0 +1,159 @@
+"""Support for Cleanmate Vaccums."""
+import logging
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.const import PERCENTAGE, UnitOfTime
+from homeassistant.helpers.entity import EntityCategory
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+
+from .const import DOMAIN
+from .devices.history import DAY, History
+from .devices.vacuum import CleanmateVacuum
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the Cleanmate sensors."""
+    config = hass.data[DOMAIN][config_entry.entry_id]
+    device = config["device"]
+    history = config["history"]
+
+    sensorEntities = [
+        CleanmateSessionDuration(device, history),
+        CleanmateSessionBatteryUsed(device, history),
+        CleanmateErrorCount(device, history),
+        CleanmatePollStatistic(device, "polls", "Polls"),
+        CleanmatePollStatistic(device, "map_requests", "Map requests"),
+        CleanmatePollStatistic(
+            device, "map_requests_skipped", "Map requests skipped"
+        ),
+    ]
+
+    _LOGGER.debug("Adding Cleanmate sensor entities to Home Assistant: %s", sensorEntities)
+    async_add_entities(sensorEntities)
+
+
+class CleanmateHistorySensor(SensorEntity):
+    """Sensor derived from the history of a Cleanmate vacuum cleaner"""
+
+    key: str
+
+    def __init__(self, device: CleanmateVacuum, history: History) -> None:
+        """Initialize the sensor"""
+        self.device = device
+        self.history = history
+
+    @property
+    def unique_id(self) -> str:
+        return f"{self.device.host}_{self.key}"
+
+    @property
+    def device_info(self):
+        """Return the device info."""
+        return {"identifiers": {(DOMAIN, self.device.host)}}
+
+
+class CleanmateSessionDuration(CleanmateHistorySensor):
+    """Duration of the last cleaning session"""
+
+    key = "last_session_duration"
+
+    @property
+    def name(self) -> str:
+        return "Last cleaning duration"
+
+    @property
+    def device_class(self) -> SensorDeviceClass:
+        return SensorDeviceClass.DURATION
+
+    @property
+    def native_unit_of_measurement(self) -> str:
+        return UnitOfTime.SECONDS
+
+    @property
+    def native_value(self) -> int | None:
+        """Seconds the last cleaning session took."""
+        duration = self.history.last_session_duration
+        if duration is None:
+            return None
+        return round(duration)
+
+
+class CleanmateSessionBatteryUsed(CleanmateHistorySensor):
+    """Battery used by the last cleaning session"""
+
+    key = "last_session_battery_used"
+
+    @property
+    def name(self) -> str:
+        return "Last cleaning battery used"
+
+    @property
+    def native_unit_of_measurement(self) -> str:
+        return PERCENTAGE
+
+    @property
+    def native_value(self) -> int | None:
+        """Battery percentage used by the last cleaning session."""
+        return self.history.last_session_battery_used
+
+
+class CleanmateErrorCount(CleanmateHistorySensor):
+    """Number of errors during the last day"""
+
+    key = "errors_last_day"
+
+    @property
+    def name(self) -> str:
+        return "Errors last day"
+
+    @property
+    def icon(self) -> str:
+        return "mdi:alert-circle-outline"
+
+    @property
+    def native_value(self) -> int:
+        """Number of errors reported during the last day."""
+        return self.history.error_count(DAY)
+
+
+class CleanmatePollStatistic(SensorEntity):
+    """Number of requests made by the polls of a Cleanmate vacuum cleaner"""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    # Changes on every poll, so keep it out of the recorder unless asked for
+    _attr_entity_registry_enabled_default = False
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_icon = "mdi:counter"
+
+    def __init__(self, device: CleanmateVacuum, key: str, name: str) -> None:
+        """Initialize the sensor"""
+        self.device = device
+        self.key = key
+        self._attr_name = name
+
+    @property
+    def unique_id(self) -> str:
+        return f"{self.device.host}_{self.key}"
+
+    @property
+    def device_info(self):
+        """Return the device info."""
+        return {"identifiers": {(DOMAIN, self.device.host)}}
+
+    @property
+    def native_value(self) -> int:
+        """Number of requests since Home Assistant started."""
+        return getattr(self.device.poll_statistics, self.key)
@@ -17,17 +17,38 @@ from homeassistant.helpers import config_validation as cv, entity_platform
 from homeassistant.helpers.icon import icon_for_battery_level
 
 from .const import DOMAIN
-from .devices.vacuum import CleanmateVacuum, WorkMode, WorkState
+from .devices.jobs import CleaningJob, JobScheduler
+from .devices.vacuum import (
+    CleanmateVacuum,
+    MapData,
+    MopMode,
+    Position,
+    WorkMode,
+    WorkState,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _position(position: Position | None) -> tuple[int, int] | tuple:
+    """Return a position as a plain tuple for state attributes."""
+    if position is None:
+        return ()
+    return position.as_tuple()
+
+
+def _rooms(map_data: MapData) -> list[dict]:
+    """Return the rooms of a map snapshot as state attributes."""
+    return [{"id": room.id, "name": room.name} for room in map_data.rooms]
+
+
 async def async_setup_platform(hass, config_entry, async_add_entities):
     """Set up the Cleanmate vacuums."""
     config = hass.data[DOMAIN][config_entry.entry_id]
     device = config["device"]
+    scheduler = config["scheduler"]
 
-    vacuums = [Vacuum(device)]  # Change name
+    vacuums = [Vacuum(device, scheduler)]  # Change name
 
     _LOGGER.debug("Adding Cleanmate Vacuums to Home Assistant: %s", vacuums)
     async_add_entities(vacuums)
@@ -51,6 +72,27 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
         "clean_rooms",
     )
 
+    platform.async_register_entity_service(
+        "queue_rooms",
+        {
+            "rooms": [
+                {
+                    vol.Required('room_id'): cv.Number,
+                    vol.Required('clean_num', default=1): cv.Number
+                }
+            ],
+            vol.Optional('fan_speed'): vol.In(list(Vacuum.fan_speed_map)),
+            vol.Optional('mop_mode'): vol.In(list(Vacuum.mop_mode_map)),
+        },
+        "queue_rooms",
+    )
+
+    platform.async_register_entity_service(
+        "clear_queue",
+        {},
+        "clear_queue",
+    )
+
 
 class Vacuum(StateVacuumEntity):
 
@@ -60,15 +102,22 @@ class Vacuum(StateVacuumEntity):
         "silent": WorkMode.Silent,
     }
 
+    mop_mode_map = {
+        "high": MopMode.High,
+        "medium": MopMode.Medium,
+        "low": MopMode.Low,
+    }
+
     work_state_map = {
         "intensive": WorkMode.Intensive,
         "standard": WorkMode.Standard,
         "silent": WorkMode.Silent,
     }
 
-    def __init__(self, device: CleanmateVacuum) -> None:
+    def __init__(self, device: CleanmateVacuum, scheduler: JobScheduler) -> None:
         """Initialize the Cleanmate vacuum cleaner"""
         self.device = device
+        self.scheduler = scheduler
         self.device.update_state()
         self._attr_fan_speed = None
         self._attr_error = None
@@ -94,11 +143,12 @@ class Vacuum(StateVacuumEntity):
     @property
     def state(self) -> str:
         """Return the state of the vacuum cleaner."""
-        current_work_state = self.device.work_state
+        state = self.device.state
+        current_work_state = state.work_state
         if current_work_state is WorkState.Cleaning:
             return STATE_CLEANING
         if current_work_state is WorkState.Idle:
-            if self.device.had_work:
+            if state.had_work:
                 return STATE_PAUSED
             return STATE_IDLE
         if current_work_state is WorkState.Returning:
@@ -118,9 +168,10 @@ class Vacuum(StateVacuumEntity):
     @property
     def battery_icon(self) -> str:
         """Return the battery icon for the vacuum cleaner."""
+        state = self.device.state
         return icon_for_battery_level(
-            battery_level=self.battery_level,
-            charging=self.device.work_state == WorkState.Charging,
+            battery_level=state.battery_level,
+            charging=state.work_state == WorkState.Charging,
         )
 
     @property
@@ -162,22 +213,18 @@ class Vacuum(StateVacuumEntity):
     @property
     def rooms(self):
         """Return the state attributes of the vacuum cleaner."""
-        rooms = []
-        for room in self.device.rooms:
-            rooms.append({
-                "id": room["regionNum"],
-                "name": room["regionName"],
-            })
-        return rooms
+        return _rooms(self.device.map_data)
 
     @property
     def extra_state_attributes(self):
         """Return the state attributes of the vacuum cleaner."""
         # Add room ids, progress, etc
+        map_data = self.device.map_data
         return {
-            "charger_position": self.device.charger_position,
-            "robot_position": self.device.robot_position,
-            "rooms": self.rooms
+            "charger_position": _position(map_data.charger_position),
+            "robot_position": _position(map_data.robot_position),
+            "rooms": _rooms(map_data),
+            "job_queue": self.scheduler.status,
         }
 
     async def async_return_to_base(self, **kwargs: Any) -> None:
@@ -206,10 +253,29 @@ class Vacuum(StateVacuumEntity):
         await self.device.start(work_mode)
 
     async def async_update(self) -> None:
-        """Update state and map of the vacuum cleaner."""
-        await self.device.update_state()
-        await self.device.update_map_data()
+        """Update state and, when needed, map of the vacuum cleaner."""
+        await self.device.update()
     
     async def clean_rooms(self, rooms: list[dict]):
         # Make sure all rooms exists
         await self.device.clean_rooms(rooms)
+
+    async def queue_rooms(
+        self,
+        rooms: list[dict],
+        fan_speed: str | None = None,
+        mop_mode: str | None = None,
+    ):
+        """Add a room cleaning job to the queue."""
+        job = CleaningJob(
+            rooms,
+            work_mode=self.fan_speed_map.get(fan_speed),
+            mop_mode=self.mop_mode_map.get(mop_mode),
+        )
+        await self.scheduler.add(job)
+        self.async_write_ha_state()
+
+    async def clear_queue(self):
+        """Remove all pending jobs from the queue."""
+        self.scheduler.clear()
+        self.async_write_ha_state()
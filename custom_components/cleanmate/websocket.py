@@ -0,0 +1,77 @@
+"""Websocket commands for the Cleanmate integration."""
+from __future__ import annotations
+
+import base64
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+from .devices.map_tiles import TileMap
+from .devices.vacuum import MapData
+
+# hass.data key set once the commands are registered
+WEBSOCKET_REGISTERED = f"{DOMAIN}_websocket_registered"
+
+
+@callback
+def async_register_websocket_commands(hass: HomeAssistant) -> None:
+    """Register the Cleanmate websocket commands, once for all entries."""
+    if hass.data.get(WEBSOCKET_REGISTERED):
+        return
+    hass.data[WEBSOCKET_REGISTERED] = True
+    websocket_api.async_register_command(hass, websocket_map_tiles)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "cleanmate/map_tiles",
+        vol.Required("entry_id"): str,
+        vol.Optional("epoch"): str,
+        vol.Optional("version", default=0): int,
+    }
+)
+@websocket_api.async_response
+async def websocket_map_tiles(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict
+) -> None:
+    """Return the map tiles that changed since the version the client has."""
+    config = hass.data.get(DOMAIN, {}).get(msg["entry_id"])
+    if config is None:
+        connection.send_error(msg["id"], "not_found", "Unknown config entry")
+        return
+
+    # Rendering is CPU bound, so it runs in the executor. The lock keeps
+    # concurrent clients from rendering the same tile map at once.
+    async with config["tile_map_lock"]:
+        result = await hass.async_add_executor_job(
+            _map_tiles,
+            config["tile_map"],
+            config["device"].map_data,
+            msg.get("epoch"),
+            msg["version"],
+        )
+    connection.send_result(msg["id"], result)
+
+
+def _map_tiles(
+    tile_map: TileMap, map_data: MapData, epoch: str | None, version: int
+) -> dict:
+    """Render the map and return the tiles changed since version."""
+    tile_map.update_map(map_data)
+    if epoch != tile_map.epoch:
+        # The client has tiles from another tile map, send everything
+        version = 0
+    return {
+        "epoch": tile_map.epoch,
+        "version": tile_map.version,
+        "width": tile_map.width,
+        "height": tile_map.height,
+        "tile_size": tile_map.tile_size,
+        "tiles": [
+            {"x": x, "y": y, "png": base64.b64encode(image).decode("ascii")}
+            for x, y, image in tile_map.tiles_since(version)
+        ],
+    }